@@ -0,0 +1,155 @@
+# Call-event journal for the IVR backend
+#
+# Request handlers only append a tuple to an in-memory ring buffer; a background
+# thread drains it in batches and appends compact JSON lines to a size-rotated
+# file. Each line is a JSON array in FIELDS order.
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger("ivr.journal")
+
+FIELDS = ("ts", "call_sid", "endpoint", "input", "intent", "branch", "response_id", "latency_ms", "locale", "caller", "station")
+
+def response_id(body: bytes) -> str:
+    """
+    Short stable id of a reply body, so identical prompts group together.
+    """
+    return format(zlib.crc32(body), "08x")
+
+class CallJournal:
+    def __init__(
+        self,
+        directory: str,
+        filename: str = "calls.jsonl",
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        buffer_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        autostart: bool = True,
+    ):
+        self.path = os.path.join(directory, filename) if directory else ""
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.autostart = autostart  # False: no writer thread, call flush() yourself
+        self.dropped = 0
+        self._buffer = deque(maxlen=buffer_size)
+        self._wakeup = threading.Event()
+        self._io_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def record(self, call_sid, endpoint, raw_input, intent, branch, resp_id, latency_ms, locale="", caller="", station=""):
+        """
+        Queues one event. Never blocks: when the buffer is full the oldest
+        queued event is dropped. locale/caller/station are the call's language
+        and Twilio From/FromCity, so a replay sets up the same session.
+        """
+        if not self.path or self._closed:
+            return
+        if self._writer is None and self.autostart:
+            self._start()
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append((round(time.time(), 3), call_sid, endpoint, raw_input, intent, branch, resp_id, round(latency_ms, 3), locale, caller, station))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Writes everything queued so far (called by the writer and at exit).
+        """
+        with self._io_lock:
+            while self._buffer:
+                batch = []
+                while self._buffer and len(batch) < self.batch_size:
+                    batch.append(self._buffer.popleft())
+                self._append(batch)
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+        self.flush()
+
+    def _start(self):
+        with self._io_lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._run, name="call-journal", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except OSError as e:
+                logger.error(f"Call journal write failed: {e}")
+
+    def _append(self, batch: List[tuple]):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = "".join(json.dumps(event, separators=(",", ":"), ensure_ascii=False) + "\n" for event in batch)
+        data = data.encode("utf-8")
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size and size + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+    def _rotate(self):
+        # calls.jsonl -> calls.jsonl.1 -> ... -> calls.jsonl.<backup_count>
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+def journal_files(path: str, filename: str = "calls.jsonl") -> List[str]:
+    """
+    Journal files for a file or directory path, oldest first. In a directory
+    only `filename` and its rotated copies (`filename`.1, .2, ...) count.
+    """
+    if not os.path.isdir(path):
+        return [path]
+    files = []
+    for name in os.listdir(path):
+        if name == filename:
+            files.append((0, name))
+        elif name.startswith(filename + ".") and name[len(filename) + 1:].isdigit():
+            files.append((-int(name[len(filename) + 1:]), name))
+    return [os.path.join(path, name) for _, name in sorted(files)]
+
+def read_events(path: str, filename: str = "calls.jsonl") -> Iterator[dict]:
+    """
+    Streams journal events (as dicts keyed by FIELDS) from a file or directory.
+    Lines written before a field was added simply lack that key.
+    """
+    for file_path in journal_files(path, filename):
+        with open(file_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield dict(zip(FIELDS, json.loads(line)))
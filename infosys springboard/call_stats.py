@@ -0,0 +1,285 @@
+# Call-lifecycle statistics for the IVR backend
+#
+# Twilio status callbacks (initiated, ringing, in-progress, completed, busy,
+# no-answer, failed, canceled) are folded into fixed rings of time buckets:
+# 60 one-second, 60 one-minute and 24 one-hour buckets. Each bucket holds
+# counters and a log-scale duration histogram, so memory stays constant
+# whatever the call volume. Closed minute buckets are flushed to SQLite and
+# read back on startup, so the hour and day windows survive a restart.
+
+import atexit
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("ivr.stats")
+
+# Duration histogram: bin 0 holds 0 s, bin 1 up to 1 s, bin i covers (GAMMA^(i-2), GAMMA^(i-1)] seconds
+GAMMA = 1.1
+DURATION_BINS = 100  # top bin starts at ~2.7 h
+_LOG_GAMMA = math.log(GAMMA)
+
+FAILED_STATUSES = ("busy", "no-answer", "failed", "canceled")
+
+# name -> (bucket width in seconds, number of buckets)
+WINDOWS = {
+    "minute": (1, 60),
+    "hour": (60, 60),
+    "day": (3600, 24),
+}
+
+def duration_bin(seconds: float) -> int:
+    if seconds <= 1:
+        return 0 if seconds <= 0 else 1
+    return min(DURATION_BINS - 1, 1 + math.ceil(math.log(seconds) / _LOG_GAMMA))
+
+def bin_value(index: int) -> float:
+    """
+    Representative duration of a bin (geometric middle), within ~5% of any value in it.
+    """
+    if index == 0:
+        return 0.0
+    return GAMMA ** (index - 1.5) if index > 1 else 1.0
+
+class Rollup:
+    """
+    Counters and duration histogram for one time bucket.
+    """
+    __slots__ = ("start", "statuses", "sip_codes", "duration_count", "duration_sum", "duration_bins")
+
+    def __init__(self, start: int = -1):
+        self.start = start
+        self.statuses = Counter()
+        self.sip_codes = Counter()
+        self.duration_count = 0
+        self.duration_sum = 0.0
+        self.duration_bins = [0] * DURATION_BINS
+
+    def add(self, status: str, duration: Optional[float], sip_code: Optional[str]):
+        self.statuses[status] += 1
+        if sip_code:
+            self.sip_codes[sip_code] += 1
+        if duration is not None:
+            self.duration_count += 1
+            self.duration_sum += duration
+            self.duration_bins[duration_bin(duration)] += 1
+
+    def merge(self, other: "Rollup"):
+        self.statuses.update(other.statuses)
+        self.sip_codes.update(other.sip_codes)
+        self.duration_count += other.duration_count
+        self.duration_sum += other.duration_sum
+        self.duration_bins = [a + b for a, b in zip(self.duration_bins, other.duration_bins)]
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.duration_count:
+            return None
+        rank = q * (self.duration_count - 1)
+        seen = 0
+        for index, count in enumerate(self.duration_bins):
+            seen += count
+            if seen > rank:
+                return round(bin_value(index), 1)
+        return round(bin_value(DURATION_BINS - 1), 1)
+
+    def summary(self) -> dict:
+        completed = self.statuses.get("completed", 0)
+        ended = completed + sum(self.statuses.get(s, 0) for s in FAILED_STATUSES)
+        return {
+            "events": sum(self.statuses.values()),
+            "statuses": dict(self.statuses),
+            "answer_rate": round(completed / ended, 3) if ended else None,
+            "sip_codes": dict(self.sip_codes),
+            "duration": {
+                "count": self.duration_count,
+                "avg": round(self.duration_sum / self.duration_count, 1) if self.duration_count else None,
+                "p50": self.percentile(0.5),
+                "p90": self.percentile(0.9),
+                "p99": self.percentile(0.99),
+            },
+        }
+
+class StatsStore:
+    """
+    SQLite table of one-minute rollups, written in bulk. Writing a minute
+    that is already stored adds to its counters.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _connect(self):
+        # The file is only created once something is flushed
+        db = sqlite3.connect(self.path, timeout=5)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS call_rollups ("
+            " bucket_start INTEGER PRIMARY KEY,"
+            " statuses TEXT NOT NULL,"
+            " sip_codes TEXT NOT NULL,"
+            " duration_count INTEGER NOT NULL,"
+            " duration_sum REAL NOT NULL,"
+            " duration_bins TEXT NOT NULL)"
+        )
+        return db
+
+    def write(self, rollups: List[Rollup]):
+        merged: Dict[int, Rollup] = {}
+        for r in rollups:
+            merged.setdefault(r.start, Rollup(r.start)).merge(r)
+        with self._connect() as db:
+            # Lock before reading, so a minute written meanwhile by another
+            # worker (or before a restart) is added to rather than replaced
+            db.execute("BEGIN IMMEDIATE")
+            placeholders = ",".join("?" * len(merged))
+            stored = db.execute(f"SELECT * FROM call_rollups WHERE bucket_start IN ({placeholders})", list(merged))
+            for r in map(_row_rollup, stored.fetchall()):
+                merged[r.start].merge(r)
+            rows = [
+                (r.start, json.dumps(r.statuses, separators=(",", ":")), json.dumps(r.sip_codes, separators=(",", ":")),
+                 r.duration_count, r.duration_sum, json.dumps(r.duration_bins, separators=(",", ":")))
+                for r in merged.values()
+            ]
+            db.executemany("INSERT OR REPLACE INTO call_rollups VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def read(self, since: int = 0) -> List[Rollup]:
+        if not os.path.exists(self.path):
+            return []
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT * FROM call_rollups WHERE bucket_start >= ? ORDER BY bucket_start", (since,)
+            ).fetchall()
+        return [_row_rollup(row) for row in rows]
+
+def _row_rollup(row: tuple) -> Rollup:
+    start, statuses, sip_codes, count, total, bins = row
+    r = Rollup(start)
+    r.statuses.update(json.loads(statuses))
+    r.sip_codes.update(json.loads(sip_codes))
+    r.duration_count = count
+    r.duration_sum = total
+    r.duration_bins = json.loads(bins)
+    return r
+
+class CallStats:
+    """
+    In-process rolling aggregates of call status events. `record()` is
+    O(1); a background thread flushes closed minute buckets to `store`.
+    The hour and day rings start from what `store` holds for the last day
+    (the one-second ring is not stored).
+    """
+
+    def __init__(
+        self,
+        store: Optional[StatsStore] = None,
+        flush_interval: float = 60.0,
+        now: Optional[float] = None,
+        autostart: bool = True,
+    ):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.autostart = autostart  # False: no flush thread, call flush() yourself
+        self._rings: Dict[str, List[Rollup]] = {name: [Rollup() for _ in range(size)] for name, (_, size) in WINDOWS.items()}
+        self._pending: Dict[int, Rollup] = {}  # minute start -> events not yet written to store
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        if store is not None:
+            self._load(time.time() if now is None else now)
+
+    def record(self, status: str, duration: Optional[float] = None, sip_code: Optional[str] = None, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        if self.store is not None and self._flusher is None and self.autostart:
+            self._start()
+        with self._lock:
+            for name, (width, size) in WINDOWS.items():
+                start = int(now) // width * width
+                ring = self._rings[name]
+                slot = (start // width) % size
+                bucket = ring[slot]
+                if bucket.start != start:
+                    bucket = ring[slot] = Rollup(start)
+                bucket.add(status, duration, sip_code)
+            if self.store is not None:
+                start = int(now) // 60 * 60
+                pending = self._pending.get(start)
+                if pending is None:
+                    pending = self._pending[start] = Rollup(start)
+                pending.add(status, duration, sip_code)
+
+    def window(self, name: str, now: Optional[float] = None) -> Rollup:
+        """
+        Merged rollup for the last minute / hour / day.
+        """
+        now = time.time() if now is None else now
+        width, size = WINDOWS[name]
+        oldest = int(now) // width * width - (size - 1) * width
+        total = Rollup(oldest)
+        with self._lock:
+            for bucket in self._rings[name]:
+                if bucket.start >= oldest:
+                    total.merge(bucket)
+        return total
+
+    def snapshot(self, now: Optional[float] = None) -> dict:
+        return {name: self.window(name, now).summary() for name in WINDOWS}
+
+    def flush(self, now: Optional[float] = None, include_open: bool = False):
+        """
+        Adds the events of every closed minute (and, at shutdown, the open
+        one) recorded since the last flush to the store in one transaction.
+        """
+        if self.store is None:
+            return
+        now = time.time() if now is None else now
+        current = int(now) // 60 * 60
+        with self._lock:
+            ready = [r for start, r in self._pending.items() if include_open or start < current]
+            for r in ready:
+                del self._pending[r.start]
+        if not ready:
+            return
+        try:
+            self.store.write(ready)
+        except sqlite3.Error:
+            # keep the events for the next flush
+            with self._lock:
+                for r in ready:
+                    self._pending.setdefault(r.start, Rollup(r.start)).merge(r)
+            raise
+
+    def _load(self, now: float):
+        minute_oldest = int(now) // 60 * 60 - 59 * 60
+        hour_oldest = int(now) // 3600 * 3600 - 23 * 3600
+        for r in self.store.read(hour_oldest):
+            for name, oldest in (("hour", minute_oldest), ("day", hour_oldest)):
+                if r.start < oldest:
+                    continue
+                width, size = WINDOWS[name]
+                start = r.start // width * width
+                ring = self._rings[name]
+                slot = (start // width) % size
+                if ring[slot].start != start:
+                    ring[slot] = Rollup(start)
+                ring[slot].merge(r)
+
+    def _start(self):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._run, name="call-stats-flush", daemon=True)
+            self._flusher.start()
+        # Also store the still-open minute on shutdown
+        atexit.register(self.flush, None, True)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"Call stats flush failed: {e}")
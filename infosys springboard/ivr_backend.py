@@ -2,15 +2,24 @@
 
 # Indian Railways IVR Backend (FastAPI + Twilio + Conversational AI)
 
-from fastapi import FastAPI, Request, Response, Body
+from fastapi import FastAPI, Request, Response, Body, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from twilio.twiml.voice_response import VoiceResponse
 from twilio.rest import Client
 import os
 import re
+import json
+import time
+import asyncio
 import logging
 from dotenv import load_dotenv
 from typing import Optional
+from urllib.parse import parse_qsl
+from collections import Counter, OrderedDict, deque
+from call_journal import CallJournal, response_id
+from call_stats import CallStats, StatsStore, WINDOWS
+from lookup_cache import LookupCache
+from locale_bundles import LocaleCache, DEFAULT_LOCALE, load_bundle, compile_matcher, keyword_pattern
 
 # Load environment variables from .env (local dev). On Render, set env vars in dashboard.
 load_dotenv()
@@ -23,6 +32,14 @@ TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
 SUPPORT_PHONE_NUMBER = os.getenv("SUPPORT_PHONE_NUMBER", "")  # optional agent number for dialing
+PARTIAL_RESULTS_ENABLED = os.getenv("PARTIAL_RESULTS_ENABLED", "true").lower() == "true"  # ask Twilio for interim transcripts
+CALL_JOURNAL_DIR = os.getenv("CALL_JOURNAL_DIR", "call_journal")  # empty disables the call-event journal
+CALL_JOURNAL_MAX_BYTES = int(os.getenv("CALL_JOURNAL_MAX_BYTES", str(10 * 1024 * 1024)))  # rotate journal file at this size
+LOCALE_CACHE_SIZE = int(os.getenv("LOCALE_CACHE_SIZE", "4"))  # compiled non-default locales kept in memory
+CALL_STATS_DB = os.getenv("CALL_STATS_DB", "call_stats.db")  # SQLite file for per-minute call rollups; empty keeps stats in memory only
+SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "true").lower() == "true"  # warm lookups as soon as a lookup intent is detected
+LOOKUP_CACHE_TTL = float(os.getenv("LOOKUP_CACHE_TTL", "60"))  # seconds a PNR / train lookup result is reused
+LOOKUP_TIMEOUT = float(os.getenv("LOOKUP_TIMEOUT", "4"))  # seconds a follow-up turn waits for a lookup (Twilio gives up at 15)
 
 # Twilio client only if credentials present
 client: Optional[Client] = None
@@ -51,6 +68,43 @@ app.add_middleware(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("ivr")
 
+# ===========================
+# Call-event journal
+# One structured event per request, written off the request path in batches
+# (see call_journal.py). Replay with replay_journal.py.
+# ===========================
+journal = CallJournal(CALL_JOURNAL_DIR, max_bytes=CALL_JOURNAL_MAX_BYTES)
+
+def journal_turn(call_id, endpoint, user_text, intent, branch, resp: Optional[Response], started: float, context: Optional[dict] = None):
+    context = session_context.get(call_id, {}) if context is None else context
+    journal.record(
+        call_id, endpoint, user_text, intent, branch,
+        response_id(resp.body) if resp is not None else "", (time.perf_counter() - started) * 1000,
+        context.get("locale", ""), context.get("caller", ""), context.get("station", ""),
+    )
+
+# ===========================
+# Call-lifecycle stats
+# Rolling minute/hour/day aggregates of Twilio status callbacks, flushed to
+# SQLite once a minute (see call_stats.py). Served by /stats.
+# ===========================
+call_stats = CallStats(StatsStore(CALL_STATS_DB) if CALL_STATS_DB else None)
+
+def record_call_status(form) -> bool:
+    """
+    Folds one status callback (CallStatus, CallDuration, SipResponseCode) into call_stats.
+    Returns False when the request carried no CallStatus.
+    """
+    status = form.get("CallStatus")
+    if not status:
+        return False
+    try:
+        duration = float(form["CallDuration"]) if form.get("CallDuration") else None
+    except ValueError:
+        duration = None
+    call_stats.record(status, duration, form.get("SipResponseCode"))
+    return True
+
 # ===========================
 # Session context (per-call)
 # Simple in-memory dict; replace with redis/db for production scale.
@@ -75,10 +129,11 @@ def map_digits_to_intent(digits: str) -> str:
     }
     return mapping.get(digits, "unknown")
 
-def detect_intent(text: str) -> str:
+def detect_intent(text: str, locale: Optional[str] = None) -> str:
     """
     Unified intent detection for speech text (lowercased).
     Returns one of the known intents or 'unknown'.
+    Keywords come from the call's locale bundle (default: English).
     """
     if text is None:
         return "unknown"
@@ -88,25 +143,10 @@ def detect_intent(text: str) -> str:
     if re.fullmatch(r"\d+", text):
         return map_digits_to_intent(text)
 
-    # Speech patterns (regex)
-    if re.search(r"\b(cancel|refund)\b", text):
-        return "cancel_ticket"
-    if re.search(r"\b(book|reserve|ticket|reservation)\b", text):
-        return "book_ticket"
-    if re.search(r"\b(pnr|status)\b", text):
-        return "check_pnr"
-    if re.search(r"\b(fare|cost|price|how much)\b", text):
-        return "fare_enquiry"
-    if re.search(r"\btatkal\b", text):
-        return "tatkal_info"
-    if re.search(r"\b(agent|operator|representative|customer care)\b", text):
-        return "talk_agent"
-    if re.search(r"\b(assistance|help|support)\b", text):
-        return "special_assistance"
-    if re.search(r"\b(live status|running status|where is train|running)\b", text):
-        return "train_live_status"
-    if re.search(r"\b(platform|which platform|where platform)\b", text):
-        return "platform_locator"
+    # Speech patterns (compiled from the locale's keyword lists, first match wins)
+    for intent, pattern in call_locale(locale)["matcher"]:
+        if pattern.search(text):
+            return intent
 
     return "unknown"
 
@@ -119,18 +159,255 @@ def webhook(path: str) -> str:
     # If not set, return path only — useful for local tests with TestClient (no external Twilio)
     return path
 
+def gather_input(resp: VoiceResponse, **kwargs):
+    """
+    Opens a <Gather> that posts the final result to /conversation.
+    When partial results are enabled, Twilio also posts interim transcripts
+    to /conversation/partial while the caller is still speaking.
+    """
+    if PARTIAL_RESULTS_ENABLED:
+        kwargs.setdefault("partial_result_callback", webhook("/conversation/partial"))
+    return resp.gather(
+        input="speech dtmf",
+        action=webhook("/conversation"),
+        **kwargs
+    )
+
+# ===========================
+# Locale bundles
+# Prompts and keywords per language live in locales/<code>.json. A locale is
+# compiled on first use into its intent matcher plus pre-rendered TwiML for
+# the greeting and every intent reply; rarely used locales are evicted (LRU).
+# ===========================
+def render_welcome(loc: dict) -> str:
+    resp = VoiceResponse()
+    gather = gather_input(resp, num_digits=1, timeout=5, **loc["gather"])
+    gather.say(loc["bundle"]["welcome"], **loc["say"])
+
+    # If no input received, repeat greeting (redirect)
+    if loc["code"] == DEFAULT_LOCALE:
+        resp.redirect(webhook("/voice"))
+    else:
+        resp.redirect(webhook(f"/voice?lang={loc['code']}"))
+    return str(resp)
+
+def render_intent(intent: str, loc: dict) -> str:
+    resp = VoiceResponse()
+    resp.say(loc["bundle"]["replies"][intent], **loc["say"])
+
+    if intent == "talk_agent":
+        # Dial support number if available, otherwise a fallback
+        agent_number = SUPPORT_PHONE_NUMBER or "+911234567890"
+        resp.dial(agent_number)
+        # Return immediately because Twilio will connect the call
+        return str(resp)
+
+    # Keep listening after speaking
+    gather = gather_input(resp, timeout=5, **loc["gather"])
+    gather.say(loc["bundle"]["anything_else"], **loc["say"])
+    return str(resp)
+
+def build_locale(code: str) -> dict:
+    bundle = load_bundle(code)
+    loc = {
+        "code": code,
+        "bundle": bundle,
+        "matcher": compile_matcher(bundle["intents"]),
+        "goodbye": keyword_pattern(bundle["goodbye_words"]),
+        # Words that only mean goodbye as the whole answer (Hindi "नहीं" is also plain "not")
+        "goodbye_answers": frozenset(bundle["goodbye_answers"]),
+        # Twilio uses the defaults (en-US) when a bundle leaves these out
+        "say": {key: bundle[key] for key in ("language", "voice") if bundle.get(key)},
+        "gather": {"language": bundle["language"]} if bundle.get("language") else {},
+    }
+    loc["welcome"] = render_welcome(loc)
+    loc["twiml"] = {intent: render_intent(intent, loc) for intent, _ in bundle["intents"]}
+    return loc
+
+locales = LocaleCache(build_locale, max_size=LOCALE_CACHE_SIZE)
+
+def call_locale(code: Optional[str] = None) -> dict:
+    """
+    Compiled locale for a call, falling back to the default one when the
+    requested language has no usable bundle.
+    """
+    try:
+        return locales.get(code)
+    except KeyError:
+        return locales.get(DEFAULT_LOCALE)
+    except Exception as e:
+        # A broken bundle must not take down every call asking for it
+        logger.error(f"Locale bundle {code!r} failed to load: {e}")
+        return locales.get(DEFAULT_LOCALE)
+
+# ===========================
+# Back-end lookups
+# Stubs for the PNR / live status / platform services. All calls go through
+# `lookups`, which caches results and coalesces concurrent requests for the
+# same key onto one in-flight future.
+# ===========================
+def fetch_pnr_status(pnr: str) -> dict:
+    # could attach more PNR metadata here
+    return {"pnr": pnr, "status": "confirmed"}
+
+def fetch_live_status(train: str) -> dict:
+    return {"train": train, "delay_minutes": 0}
+
+def fetch_platform(train: str) -> dict:
+    return {"train": train, "platform": 5}
+
+LOOKUPS = {
+    "check_pnr": fetch_pnr_status,
+    "train_live_status": fetch_live_status,
+    "platform_locator": fetch_platform,
+}
+
+# Bundle followup text used to speak each lookup result
+LOOKUP_TEXT = {
+    "check_pnr": "pnr_confirmed",
+    "train_live_status": "live_status",
+    "platform_locator": "platform",
+}
+
+lookups = LookupCache(LOOKUPS, ttl=LOOKUP_CACHE_TTL)
+
+def lookup_key(intent: Optional[str], text: str) -> Optional[str]:
+    """
+    The lookup a follow-up answer asks for: a ten digit PNR, or a five digit
+    train number anywhere in the text. None when the answer isn't complete.
+    """
+    text = (text or "").strip()
+    if intent == "check_pnr":
+        return text if text.isdigit() and len(text) == 10 else None
+    if intent in ("train_live_status", "platform_locator"):
+        match = re.search(r"\b\d{5}\b", text)
+        return match.group(0) if match else None
+    return None
+
+def render_lookup(intent: str, key: str, data: dict, locale: Optional[str] = None) -> str:
+    """
+    Renders a back-end lookup result as the reply in the caller's language.
+    """
+    template = call_locale(locale)["bundle"]["followups"][LOOKUP_TEXT[intent]]
+    return template.format(**{"pnr": key, "train": key, **data})
+
+# ===========================
+# Speculative prefetch
+# Once a lookup intent is detected the caller's next utterance is the number
+# to look up, so we start the likely lookups right away: recent PNRs for the
+# caller's number, and the trains most asked about at the caller's station.
+# ===========================
+RECENT_PNRS_PER_CALLER = 3
+HOT_TRAINS_PREFETCH = 3
+MAX_TRACKED_CALLERS = 10000
+MAX_TRACKED_TRAINS = 200  # per station
+MAX_TRACKED_STATIONS = 1000
+
+recent_pnrs = OrderedDict()  # caller number -> deque of recent PNRs (LRU over callers)
+hot_trains = OrderedDict()   # station ("" = all callers) -> Counter of train numbers (LRU over stations)
+
+def remember_caller(context: dict, caller: Optional[str], station: Optional[str]):
+    # Only called once a lookup intent is detected, so calls that never ask
+    # for a lookup add no session state
+    context.setdefault("caller", caller or "")
+    context.setdefault("station", station or "")
+
+def remember_lookup(context: dict, intent: str, key: str):
+    if intent == "check_pnr":
+        caller = context.get("caller")
+        if not caller:
+            return
+        pnrs = recent_pnrs.pop(caller, None) or deque(maxlen=RECENT_PNRS_PER_CALLER)
+        if key in pnrs:
+            pnrs.remove(key)
+        pnrs.appendleft(key)
+        recent_pnrs[caller] = pnrs
+        while len(recent_pnrs) > MAX_TRACKED_CALLERS:
+            recent_pnrs.popitem(last=False)
+        return
+
+    # "" is touched last on every train lookup, so it is never the one evicted
+    for station in dict.fromkeys((context.get("station") or "", "")):
+        counts = hot_trains.pop(station, None) or Counter()
+        counts[key] += 1
+        if len(counts) > MAX_TRACKED_TRAINS:
+            counts = Counter(dict(counts.most_common(MAX_TRACKED_TRAINS // 2)))
+        hot_trains[station] = counts
+    while len(hot_trains) > MAX_TRACKED_STATIONS:
+        hot_trains.popitem(last=False)
+
+def warm_lookups(context: dict, intent: str):
+    """
+    Starts the lookups the caller is most likely to ask for next.
+    """
+    if not SPECULATIVE_PREFETCH:
+        return
+    if intent == "check_pnr":
+        keys = list(recent_pnrs.get(context.get("caller") or "", ()))
+    else:
+        station = context.get("station") or ""
+        counts = hot_trains.get(station) or hot_trains.get("") or Counter()
+        keys = [train for train, _ in counts.most_common(HOT_TRAINS_PREFETCH)]
+    for key in keys:
+        lookups.prefetch(intent, key)
+
+def intent_twiml(intent: str, locale: Optional[str] = None) -> Optional[str]:
+    """
+    Pre-rendered TwiML reply for a detected intent, or None when the
+    intent has no direct reply and must go through next_step().
+    """
+    return call_locale(locale)["twiml"].get(intent)
+
+# ===========================
+# Early intent detection on partial speech results
+# While the caller is still speaking we detect intent on every interim
+# transcript and, once a PNR / train number is complete, start the follow-up
+# lookup so the final turn only has to join it. Replies themselves are
+# pre-rendered per locale, so there is nothing else to prepare early.
+# ===========================
+def process_partial(call_id: str, partial_text: str) -> str:
+    """
+    Feeds one interim transcript for a call. Returns the intent detected so far.
+    """
+    text = (partial_text or "").lower().strip()
+    if not text:
+        return "unknown"
+
+    context = session_context.get(call_id, {})
+    intent = detect_intent(text, context.get("locale"))
+    if intent != "unknown":
+        return intent
+
+    # Caller is answering a lookup question: fetch as soon as the number is complete
+    last_intent = context.get("last_intent")
+    key = lookup_key(last_intent, text)
+    if key:
+        lookups.prefetch(last_intent, key)
+    return intent
+
 # ===========================
 # Conversation follow-up handler (keeps call active)
 # ===========================
-def next_step(call_id: str, user_text: str):
+def next_step(call_id: str, user_text: str, lookup_result: Optional[dict] = None, lookup_failed: bool = False):
+    """
+    Follow-up reply for the call's last intent. `lookup_result` is the
+    back-end answer for the PNR / train number in `user_text`, already
+    fetched by the caller (handle_turn awaits it); without one the caller
+    is asked for the number again. `lookup_failed` means the back end
+    errored or timed out, and the caller is asked to try again.
+    """
     user_text = (user_text or "").lower()
     context = session_context.get(call_id, {"last_intent": None})
     last_intent = context.get("last_intent")
+    locale = context.get("locale")
+    loc = call_locale(locale)
+    bundle = loc["bundle"]
+    texts = bundle["followups"]
 
     # End conversation if user says goodbye / thanks / no
-    if re.search(r"\b(thank you|thanks|bye|no|goodbye)\b", user_text):
+    if loc["goodbye"].search(user_text) or user_text.strip(" .!?।") in loc["goodbye_answers"]:
         resp = VoiceResponse()
-        resp.say("Thank you for using Indian Railways helpline. Have a great journey ahead!")
+        resp.say(texts["goodbye"], **loc["say"])
         resp.hangup()
         # Clear context
         session_context.pop(call_id, None)
@@ -138,48 +415,53 @@ def next_step(call_id: str, user_text: str):
 
     # Follow-ups per last intent
     if last_intent == "book_ticket":
-        if "ac" in user_text or user_text == "1" or user_text == "ac":
+        if any(w in user_text for w in bundle["ac_words"]) or user_text == "1":
             context["booking_class"] = "AC"
-            response_text = "A C class selected. Please confirm your travel date."
-        elif "sleeper" in user_text or user_text == "2" or user_text == "sleeper":
+            response_text = texts["ac_selected"]
+        elif any(w in user_text for w in bundle["sleeper_words"]) or user_text == "2":
             context["booking_class"] = "Sleeper"
-            response_text = "Sleeper class selected. Please confirm your travel date."
-        elif "tomorrow" in user_text or "today" in user_text or re.search(r"\d{1,2}\s+\w+", user_text):
+            response_text = texts["sleeper_selected"]
+        elif any(w in user_text for w in bundle["date_words"]) or re.search(r"\d{1,2}\s+\w+", user_text):
             context["booking_date"] = user_text
-            response_text = f"Booking date {user_text} noted. Your ticket will be processed soon. Would you like anything else?"
+            response_text = texts["date_noted"].format(date=user_text)
         else:
-            response_text = "Please specify your class — Sleeper or AC."
-
-    elif last_intent == "check_pnr":
-        if user_text.isdigit() and len(user_text) == 10:
-            response_text = f"PNR {user_text} is confirmed. The train is running on time. Need further help?"
-            # could attach more PNR metadata here
+            response_text = texts["ask_class"]
+
+    elif last_intent in LOOKUPS:
+        # expected: PNR / train number in user_text
+        key = lookup_key(last_intent, user_text)
+        if key is not None and lookup_failed:
+            response_text = texts["lookup_unavailable"]
+        elif key is not None and lookup_result is not None:
+            remember_lookup(context, last_intent, key)
+            response_text = render_lookup(last_intent, key, lookup_result, locale)
+        elif last_intent == "check_pnr":
+            response_text = texts["pnr_invalid"]
         else:
-            response_text = "Please provide a valid ten digit P N R number."
-
-    elif last_intent == "train_live_status":
-        # expected: train number in user_text
-        response_text = f"Fetching live running status for train {user_text}. The train is currently reported on time."
-
-    elif last_intent == "platform_locator":
-        response_text = f"Platform information for train {user_text}: It is expected to arrive at platform number 5."
+            response_text = texts["train_invalid"]
 
     else:
-        response_text = "Sorry, I didn’t understand that. Could you please repeat?"
+        response_text = texts["not_understood"]
 
     # Save updated context
     session_context[call_id] = context
 
     # Build TwiML response and keep gather open for more input
     resp = VoiceResponse()
-    gather = resp.gather(
-        input="speech dtmf",
-        action=webhook("/conversation"),
-        timeout=5
-    )
-    gather.say(response_text)
+    gather = gather_input(resp, timeout=5, **loc["gather"])
+    gather.say(response_text, **loc["say"])
     return Response(content=str(resp), media_type="application/xml")
 
+def set_call_locale(call_id: str, code: Optional[str]) -> dict:
+    """
+    Remembers the caller's language for the rest of the call. Only
+    non-default locales are stored, so English calls add no session state.
+    """
+    loc = call_locale(code)
+    if call_id and loc["code"] != DEFAULT_LOCALE:
+        session_context.setdefault(call_id, {})["locale"] = loc["code"]
+    return loc
+
 # ===========================
 # /voice — initial greeting endpoint
 # ===========================
@@ -188,105 +470,172 @@ async def voice_start(request: Request):
     """
     Entry point for Twilio call — greets and starts listening for input.
     """
-    resp = VoiceResponse()
-    gather = resp.gather(
-        input="speech dtmf",
-        num_digits=1,
-        timeout=5,
-        action=webhook("/conversation")
-    )
+    started = time.perf_counter()
+    form = await request.form()
+    call_id = form.get("CallSid") or ""
+    # Language comes from the webhook URL configured on the number, e.g. /voice?lang=hi-IN
+    loc = set_call_locale(call_id, request.query_params.get("lang"))
 
-    gather.say(
-        "Welcome to Indian Railways helpline. "
-        "You can speak naturally or press a number. "
-        "For booking a ticket press 1. "
-        "To check P N R status press 2. "
-        "To cancel your ticket press 3. "
-        "For fare enquiry press 4. "
-        "For Tatkal information press 5. "
-        "To talk to an agent press 6. "
-        "For special assistance press 7. "
-        "For live train running status press 8. "
-        "For platform locator press 9."
-    )
-
-    # If no input received, repeat greeting (redirect)
-    resp.redirect(webhook("/voice"))
-    return Response(content=str(resp), media_type="application/xml")
+    response = Response(content=loc["welcome"], media_type="application/xml")
+    journal_turn(call_id, "/voice", "", None, "greeting", response, started)
+    return response
 
 # ===========================
 # /conversation — main IVR logic
 # ===========================
-@app.post("/conversation")
-async def conversation(request: Request):
+async def handle_turn(
+    call_id: str,
+    user_text: str,
+    endpoint: str = "/conversation",
+    started: Optional[float] = None,
+    caller: Optional[str] = None,
+    station: Optional[str] = None,
+) -> Response:
     """
-    Handles speech or keypad (DTMF) input during an active call.
+    Answers one final caller utterance (speech or DTMF), joining any lookup
+    already started from partial results.
+    The turn is journaled under `endpoint`, timed from `started`.
+    `caller` / `station` (Twilio From / FromCity) drive speculative prefetch.
     """
-    form = await request.form()
-    call_id = form.get("CallSid") or form.get("CallSid", "")
-    speech_result = form.get("SpeechResult") or ""
-    digits = form.get("Digits") or ""
-    user_text = speech_result or digits or ""
+    started = started or time.perf_counter()
+    context = session_context.get(call_id, {})
+    locale = context.get("locale")
+    last_intent = context.get("last_intent")
 
-    logger.info(f"Received input from Call {call_id}: {user_text}")
+    # Answer to a lookup question: start the lookup now, or join the one
+    # already in flight from partial results / speculative prefetch
+    key = lookup_key(last_intent, user_text)
+    pending = lookups.submit(last_intent, key) if key else None
 
     # Detect intent (unified). digits map to intents automatically.
-    intent = detect_intent(user_text)
-    context = session_context.get(call_id, {})
+    intent = detect_intent(user_text, locale)
 
     # Store last intent if known
     if intent and intent != "unknown":
         context["last_intent"] = intent
         session_context[call_id] = context
+        if intent in LOOKUPS:
+            remember_caller(context, caller, station)
+            warm_lookups(context, intent)
 
-    resp = VoiceResponse()
-
-    # Intent handling
-    if intent == "book_ticket":
-        resp.say("You want to book a ticket. Which class would you prefer, Sleeper or AC? Press 1 for AC and 2 for Sleeper, or say your choice.")
-
-    elif intent == "check_pnr":
-        resp.say("Please tell me your ten digit P N R number.")
-
-    elif intent == "cancel_ticket":
-        resp.say("Your ticket cancellation request has been received. Refunds take five to seven days.")
-
-    elif intent == "fare_enquiry":
-        resp.say("Train fare enquiry. Please tell me your train number.")
-
-    elif intent == "tatkal_info":
-        resp.say("Tatkal booking opens one day in advance: 10 AM for AC and 11 AM for non-AC classes.")
-
-    elif intent == "talk_agent":
-        resp.say("Connecting you to a support agent.")
-        # Dial support number if available, otherwise a fallback
-        agent_number = SUPPORT_PHONE_NUMBER or "+911234567890"
-        resp.dial(agent_number)
-        # Return immediately because Twilio will connect the call
-        return Response(content=str(resp), media_type="application/xml")
+    twiml = intent_twiml(intent, locale)
+    if twiml is None:
+        # Unknown intent -> forward to follow-up handler which may ask clarifying question
+        lookup_result, lookup_failed = None, False
+        if pending is not None:
+            try:
+                # shield: a timed-out turn must not cancel the shared lookup other turns may join
+                lookup_result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(pending)), LOOKUP_TIMEOUT)
+            except Exception as e:
+                logger.error(f"{last_intent} lookup for {key} failed: {e!r}")
+                lookup_failed = True
+        response = next_step(call_id, user_text, lookup_result, lookup_failed)
+        branch = f"followup:{last_intent or 'none'}"
+    else:
+        response = Response(content=twiml, media_type="application/xml")
+        branch = f"intent:{intent}"
 
-    elif intent == "special_assistance":
-        resp.say("Our special assistance team will help you shortly. Please hold.")
+    journal_turn(call_id, endpoint, user_text, intent, branch, response, started)
+    return response
 
-    elif intent == "train_live_status":
-        resp.say("Please tell me your train number to check live running status.")
+@app.post("/conversation")
+async def conversation(request: Request):
+    """
+    Handles speech or keypad (DTMF) input during an active call.
+    """
+    started = time.perf_counter()
+    form = await request.form()
+    call_id = form.get("CallSid") or form.get("CallSid", "")
+    speech_result = form.get("SpeechResult") or ""
+    digits = form.get("Digits") or ""
+    user_text = speech_result or digits or ""
 
-    elif intent == "platform_locator":
-        resp.say("Please tell me your train number to locate the platform.")
+    logger.debug(f"Received input from Call {call_id}: {user_text}")
 
-    else:
-        # Unknown intent -> forward to follow-up handler which may ask clarifying question
-        return next_step(call_id, user_text)
+    return await handle_turn(call_id, user_text, "/conversation", started, form.get("From"), form.get("FromCity"))
 
-    # Keep listening after speaking
-    gather = resp.gather(
-        input="speech dtmf",
-        action=webhook("/conversation"),
-        timeout=5
-    )
-    gather.say("Is there anything else you’d like help with?")
+# ===========================
+# /conversation/partial — Twilio partialResultCallback
+# Twilio keeps posting UnstableSpeechResult while the caller speaks.
+# ===========================
+@app.post("/conversation/partial")
+async def conversation_partial(request: Request):
+    started = time.perf_counter()
+    form = await request.form()
+    call_id = form.get("CallSid") or ""
+    partial_text = form.get("UnstableSpeechResult") or form.get("SpeechResult") or ""
+    intent = process_partial(call_id, partial_text)
+    journal_turn(call_id, "/conversation/partial", partial_text, intent, "partial", None, started)
+    # Twilio ignores the body of partial callbacks
+    return Response(status_code=204)
 
-    return Response(content=str(resp), media_type="application/xml")
+# ===========================
+# /media-stream — streaming transcripts over WebSocket
+# Twilio does not transcribe Media Streams, so this endpoint is meant for an
+# external speech-recognition relay (not part of this repo): the relay
+# receives the call's Twilio Media Stream, forwards its start/stop events
+# (same envelope) and sends what it hears as "transcript" events:
+#   {"event": "transcript", "transcript": {"text": "...", "final": false}}
+# Partials feed early intent detection; a final transcript gets the reply as
+#   {"event": "response", "streamSid": "...", "twiml": "<Response>...</Response>"}
+# and applying that TwiML to the call is up to the relay.
+# ===========================
+@app.websocket("/media-stream")
+async def media_stream(websocket: WebSocket):
+    await websocket.accept()
+    call_id = ""
+    stream_sid = ""
+    caller = station = None
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                logger.debug(f"Skipping malformed media stream frame: {raw[:200]!r}")
+                continue
+            event = message.get("event")
+
+            if event == "start":
+                start = message.get("start", {})
+                call_id = start.get("callSid") or ""
+                stream_sid = message.get("streamSid") or start.get("streamSid") or ""
+                # <Stream><Parameter name="lang" value="hi-IN"/></Stream> selects the language
+                params = start.get("customParameters", {})
+                set_call_locale(call_id, params.get("lang"))
+                caller, station = params.get("from"), params.get("station")
+                context = {**session_context.get(call_id, {}), "caller": caller or "", "station": station or ""}
+                journal_turn(call_id, "/media-stream/start", "", None, "start", None, time.perf_counter(), context)
+                logger.info(f"Media stream {stream_sid} started for Call {call_id}")
+
+            elif event == "transcript":
+                if not call_id:
+                    # No CallSid yet: there is no session to attach the turn to
+                    logger.debug("Skipping transcript received before stream start")
+                    continue
+                started = time.perf_counter()
+                transcript = message.get("transcript", {})
+                text = transcript.get("text") or ""
+                if not transcript.get("final"):
+                    intent = process_partial(call_id, text)
+                    journal_turn(call_id, "/media-stream/partial", text, intent, "partial", None, started)
+                    continue
+                logger.debug(f"Received streamed input from Call {call_id}: {text}")
+                resp = await handle_turn(call_id, text, "/media-stream", started, caller, station)
+                await websocket.send_text(json.dumps({
+                    "event": "response",
+                    "streamSid": stream_sid,
+                    "twiml": resp.body.decode(),
+                }))
+
+            elif event == "stop":
+                await websocket.close()
+                break
+            # "connected", "media" and "mark" need no handling here
+    except WebSocketDisconnect:
+        pass
 
 # ===========================
 # /call/start — start outbound call via Twilio REST API
@@ -327,8 +676,60 @@ def start_real_call(payload: dict = Body(...)):
 # ===========================
 @app.post("/call/end")
 async def call_end(request: Request):
+    started = time.perf_counter()
     form = await request.form()
     call_id = form.get("CallSid")
-    session_context.pop(call_id, None)
+    context = session_context.pop(call_id, None) or {}
+    # Call statuses are counted only by /call/status, so a number with both
+    # callbacks configured does not count its final status twice
     logger.info(f"Call ended and context cleared for {call_id}")
-    return Response(status_code=200)
+    response = Response(status_code=200)
+    journal_turn(call_id or "", "/call/end", "", None, "end", response, started, context)
+    return response
+
+# ===========================
+# /call/status — Twilio status callback (every lifecycle event)
+# Served by a plain ASGI middleware in front of the router: callbacks arrive
+# for every call state change, and FastAPI routing + dependency handling
+# would cost more than the aggregation itself.
+# ===========================
+class StatusCallbackMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != "/call/status" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        # Twilio posts x-www-form-urlencoded
+        if record_call_status(dict(parse_qsl(body.decode("utf-8", "replace")))):
+            status, content = 204, b""
+        else:
+            status, content = 200, json.dumps({"error": "Missing 'CallStatus'"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(content)).encode())],
+        })
+        await send({"type": "http.response.body", "body": content})
+
+app.add_middleware(StatusCallbackMiddleware)
+
+# ===========================
+# /stats — call volume and outcomes over the last minute / hour / day
+# ===========================
+@app.get("/stats")
+def stats(window: Optional[str] = None):
+    if window is None:
+        return call_stats.snapshot()
+    if window not in WINDOWS:
+        return {"error": f"Unknown window '{window}', use one of: {', '.join(WINDOWS)}"}
+    return {window: call_stats.window(window).summary()}
@@ -0,0 +1,100 @@
+# Locale bundles for the IVR backend
+#
+# A bundle is a JSON file in LOCALES_DIR (e.g. locales/hi-IN.json) holding the
+# prompts, intent keywords and TwiML language/voice for one language. Bundles
+# are read only when a call first needs them; keys a bundle leaves out fall
+# back to the default (English) bundle.
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+LOCALES_DIR = os.getenv("LOCALES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales"))
+DEFAULT_LOCALE = os.getenv("DEFAULT_LOCALE", "en-IN")
+# Locale codes come from the caller (?lang=), so only plain "xx-YY" codes
+# are ever turned into a file name
+LOCALE_CODE = re.compile(r"[a-z]{2,3}-[A-Z]{2}")
+
+def load_bundle(code: str) -> dict:
+    """
+    Reads a bundle from disk, filling missing prompts from the default bundle.
+    Raises KeyError for a malformed code or a locale that has no bundle file.
+    """
+    if not isinstance(code, str) or not LOCALE_CODE.fullmatch(code):
+        raise KeyError(code)
+    path = os.path.join(LOCALES_DIR, f"{code}.json")
+    if not os.path.exists(path):
+        raise KeyError(code)
+    with open(path, encoding="utf-8") as f:
+        bundle = json.load(f)
+    if code != DEFAULT_LOCALE:
+        base = load_bundle(DEFAULT_LOCALE)
+        for key, value in base.items():
+            if isinstance(value, dict):
+                bundle[key] = {**value, **bundle.get(key, {})}
+            else:
+                bundle.setdefault(key, value)
+    bundle["code"] = code
+    return bundle
+
+def keyword_pattern(words: List[str]):
+    """
+    One regex for a keyword list. Whole words only, but written with
+    lookarounds instead of \\b so words ending in Indic vowel signs still match.
+    """
+    alternation = "|".join(re.escape(w.lower()) for w in words)
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)")
+
+def compile_matcher(intents: List[list]) -> List[Tuple[str, "re.Pattern"]]:
+    """
+    Compiles the bundle's ordered [intent, keywords] list; the first
+    matching intent wins, as in detect_intent().
+    """
+    return [(intent, keyword_pattern(words)) for intent, words in intents]
+
+class LocaleCache:
+    """
+    LRU cache of compiled locales. `build(code)` compiles one locale; at most
+    `max_size` non-default locales are kept and the default one is never evicted.
+    """
+
+    def __init__(self, build: Callable[[str], object], max_size: int = 4):
+        self.build = build
+        self.max_size = max_size
+        self.default = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, code: Optional[str] = None):
+        code = code or DEFAULT_LOCALE
+        if code == DEFAULT_LOCALE:
+            if self.default is None:
+                self.default = self.build(code)
+            return self.default
+
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry is not None:
+                self._entries.move_to_end(code)
+                return entry
+
+        entry = self.build(code)
+        with self._lock:
+            self._entries[code] = entry
+            self._entries.move_to_end(code)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            codes = list(self._entries)
+        return ([DEFAULT_LOCALE] if self.default is not None else []) + codes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self.default = None
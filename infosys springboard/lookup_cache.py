@@ -0,0 +1,74 @@
+# Shared cache of back-end lookups (PNR status, live running status, platform)
+#
+# Every lookup goes through submit(), which returns a concurrent.futures.Future:
+# a fresh cached result, the lookup already in flight for the same key, or a
+# new one started on the worker pool. Speculative prefetches, partial-result
+# prefetches and the caller's actual follow-up turn therefore share one fetch.
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+class LookupCache:
+    def __init__(
+        self,
+        fetchers: Dict[str, Callable[[str], dict]],
+        ttl: float = 60.0,
+        max_entries: int = 4096,
+        max_workers: int = 8,
+    ):
+        self.fetchers = fetchers
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "coalesced": 0, "fetches": 0}
+        self._entries = OrderedDict()  # (kind, key) -> (future, expires_at)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lookup")
+
+    def submit(self, kind: str, key: Hashable) -> Future:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is not None:
+                future, expires_at = entry
+                if not future.done():
+                    self.stats["coalesced"] += 1
+                    return future
+                if expires_at > now and not future.cancelled() and future.exception() is None:
+                    self._entries.move_to_end((kind, key))
+                    self.stats["hits"] += 1
+                    return future
+
+            self.stats["fetches"] += 1
+            future = self._pool.submit(self.fetchers[kind], key)
+            self._entries[(kind, key)] = (future, now + self.ttl)
+            self._entries.move_to_end((kind, key))
+            self._evict()
+            return future
+
+    def prefetch(self, kind: str, key: Hashable):
+        """
+        Starts the lookup (if not cached or in flight) without waiting for it.
+        """
+        self.submit(kind, key)
+
+    def get(self, kind: str, key: Hashable, timeout: Optional[float] = None) -> dict:
+        return self.submit(kind, key).result(timeout)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def _evict(self):
+        # Oldest finished entries go first; in-flight lookups are never dropped
+        while len(self._entries) > self.max_entries:
+            for cache_key, (future, _) in self._entries.items():
+                if future.done():
+                    del self._entries[cache_key]
+                    break
+            else:
+                return
@@ -0,0 +1,107 @@
+# Replays a call-event journal through the IVR backend
+#
+# Usage:
+#   python replay_journal.py call_journal/            # max speed
+#   python replay_journal.py call_journal/ --paced    # original pacing
+#   python replay_journal.py calls.jsonl --paced --speed 10
+#
+# Events are sent in journal order with their original CallSid, so session
+# state evolves the way it did on the live call.
+
+import argparse
+import os
+import time
+from collections import Counter
+
+# Don't journal the replay itself (set before ivr_backend reads its config)
+os.environ["CALL_JOURNAL_DIR"] = ""
+
+from fastapi.testclient import TestClient
+from call_journal import read_events, response_id
+import ivr_backend
+
+def send_event(client: TestClient, event: dict):
+    """
+    Re-issues one journaled request. Streamed turns are replayed through the
+    equivalent HTTP webhooks, which share the same turn handling.
+    """
+    call_sid = event["call_sid"]
+    endpoint = event["endpoint"]
+    caller = {"CallSid": call_sid}
+    if event.get("caller"):
+        caller["From"] = event["caller"]
+    if event.get("station"):
+        caller["FromCity"] = event["station"]
+    if endpoint in ("/conversation", "/media-stream"):
+        return client.post("/conversation", data={**caller, "SpeechResult": event["input"] or ""})
+    if endpoint in ("/conversation/partial", "/media-stream/partial"):
+        return client.post("/conversation/partial", data={"CallSid": call_sid, "UnstableSpeechResult": event["input"] or ""})
+    if endpoint in ("/voice", "/media-stream/start"):
+        # The language is picked by the webhook URL (or <Stream> parameter) on the live call
+        url = f"/voice?lang={event['locale']}" if event.get("locale") else "/voice"
+        return client.post(url, data=caller)
+    if endpoint == "/call/end":
+        return client.post(endpoint, data={"CallSid": call_sid})
+    return None
+
+def replay(events, client: TestClient, paced: bool = False, speed: float = 1.0) -> dict:
+    """
+    Streams events through the app and returns a summary.
+    With paced=True the gaps between original timestamps are kept (divided by speed).
+    """
+    sent = Counter()
+    failed = Counter()
+    mismatched = 0
+    first_ts = None
+    start = time.perf_counter()
+
+    for event in events:
+        if paced:
+            first_ts = event["ts"] if first_ts is None else first_ts
+            delay = (event["ts"] - first_ts) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+        resp = send_event(client, event)
+        if resp is None:
+            continue
+        sent[event["endpoint"]] += 1
+        if resp.status_code >= 400:
+            failed[event["endpoint"]] += 1
+        elif event["response_id"] and response_id(resp.content) != event["response_id"]:
+            mismatched += 1
+
+    elapsed = time.perf_counter() - start
+    total = sum(sent.values())
+    return {
+        "events": total,
+        "failed": sum(failed.values()),
+        "mismatched": mismatched,
+        "seconds": elapsed,
+        "per_second": total / elapsed if elapsed else 0.0,
+        "by_endpoint": dict(sent),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay an IVR call-event journal")
+    parser.add_argument("path", help="journal file or directory")
+    parser.add_argument("--paced", action="store_true", help="keep the original gaps between events")
+    parser.add_argument("--speed", type=float, default=1.0, help="speed-up factor for --paced")
+    args = parser.parse_args()
+
+    client = TestClient(ivr_backend.app)
+    result = replay(read_events(args.path), client, paced=args.paced, speed=args.speed)
+
+    print("\n JOURNAL REPLAY RESULTS")
+    print("============================")
+    print(f"Events Replayed:       {result['events']}")
+    for endpoint, count in sorted(result["by_endpoint"].items()):
+        print(f"  {endpoint:<22} {count}")
+    print(f"Failed Requests:       {result['failed']}")
+    print(f"Different Responses:   {result['mismatched']}")
+    print(f"Total Time:            {result['seconds']:.2f} sec")
+    print(f"Throughput:            {result['per_second']:.1f} events/sec")
+    print("============================")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+
+# Keep test calls out of the real call journal and stats database;
+# both stores are opened when ivr_backend is imported.
+os.environ["CALL_JOURNAL_DIR"] = ""
+os.environ["CALL_STATS_DB"] = ""
@@ -63,3 +63,233 @@ def test_call_end_clears_context():
     client.post("/conversation", data={"CallSid": "abc125", "SpeechResult": "book ticket"})
     resp = client.post("/call/end", data=data)
     assert resp.status_code == 200
+
+
+def test_partial_callback_then_final_turn():
+    cid = "int011"
+    r1 = client.post("/conversation/partial", data={"CallSid": cid, "UnstableSpeechResult": "check my"})
+    r2 = client.post("/conversation/partial", data={"CallSid": cid, "UnstableSpeechResult": "check my pnr"})
+    assert r1.status_code == 204 and r2.status_code == 204
+
+    response = client.post("/conversation", data={"CallSid": cid, "SpeechResult": "check my PNR"})
+    assert "P N R" in response.text
+    assert session_context[cid]["last_intent"] == "check_pnr"
+
+
+def test_gather_requests_partial_results():
+    response = client.post("/voice")
+    assert 'partialResultCallback="/conversation/partial"' in response.text
+
+
+def test_media_stream_transcripts():
+    cid = "int012"
+    with client.websocket_connect("/media-stream") as ws:
+        ws.send_json({"event": "connected"})
+        ws.send_json({"event": "start", "streamSid": "MZ1", "start": {"callSid": cid}})
+        ws.send_json({"event": "transcript", "transcript": {"text": "where is", "final": False}})
+        ws.send_json({"event": "transcript", "transcript": {"text": "where is my train running", "final": False}})
+        ws.send_json({"event": "transcript", "transcript": {"text": "where is my train running", "final": True}})
+        reply = ws.receive_json()
+        assert reply["event"] == "response"
+        assert reply["streamSid"] == "MZ1"
+        assert "live running status" in reply["twiml"]
+
+        ws.send_json({"event": "transcript", "transcript": {"text": "12951", "final": False}})
+        ws.send_json({"event": "transcript", "transcript": {"text": "12951", "final": True}})
+        assert "train 12951" in ws.receive_json()["twiml"]
+        ws.send_json({"event": "stop"})
+
+
+def test_media_stream_skips_bad_frames_and_early_transcripts():
+    from ivr_backend import session_context
+    cid = "int023"
+    with client.websocket_connect("/media-stream") as ws:
+        ws.send_text("{not json")
+        ws.send_json({"event": "transcript", "transcript": {"text": "book a ticket", "final": True}})
+        ws.send_json({"event": "start", "streamSid": "MZ2", "start": {"callSid": cid}})
+        ws.send_json({"event": "transcript", "transcript": {"text": "book a ticket", "final": True}})
+        reply = ws.receive_json()
+        assert reply["streamSid"] == "MZ2"
+        assert "Sleeper" in reply["twiml"] or "book a ticket" in reply["twiml"]
+        ws.send_json({"event": "stop"})
+    assert "" not in session_context
+
+
+def test_journal_replay_reproduces_responses():
+    from replay_journal import replay
+    events = [
+        {"ts": 1.0, "call_sid": "int013", "endpoint": "/voice", "input": "", "response_id": ""},
+        {"ts": 1.5, "call_sid": "int013", "endpoint": "/conversation", "input": "check pnr", "response_id": ""},
+        {"ts": 2.0, "call_sid": "int013", "endpoint": "/conversation/partial", "input": "1234567890", "response_id": ""},
+        {"ts": 2.5, "call_sid": "int013", "endpoint": "/conversation", "input": "1234567890", "response_id": ""},
+        {"ts": 3.0, "call_sid": "int013", "endpoint": "/call/end", "input": "", "response_id": ""},
+    ]
+    result = replay(events, client)
+    assert result["events"] == 5
+    assert result["failed"] == 0
+    assert result["by_endpoint"]["/conversation"] == 2
+
+
+def test_journal_replay_keeps_call_language(tmp_path, monkeypatch):
+    import ivr_backend
+    from call_journal import CallJournal, read_events
+    from replay_journal import replay
+    journal = CallJournal(str(tmp_path), flush_interval=60)
+    monkeypatch.setattr(ivr_backend, "journal", journal)
+
+    cid = "int020"
+    caller = {"CallSid": cid, "From": "+919800000020", "FromCity": "Pune"}
+    client.post("/voice?lang=hi-IN", data=caller)
+    client.post("/conversation", data={**caller, "SpeechResult": "पीएनआर स्थिति"})
+    client.post("/conversation/partial", data={**caller, "UnstableSpeechResult": "12345"})
+    client.post("/conversation", data={**caller, "SpeechResult": "1234567890"})
+    client.post("/call/end", data={"CallSid": cid})
+    journal.close()
+
+    events = list(read_events(str(tmp_path)))
+    assert events[0]["locale"] == "hi-IN"
+    assert events[1]["caller"] == "+919800000020" and events[1]["station"] == "Pune"
+    assert events[2]["endpoint"] == "/conversation/partial" and events[2]["locale"] == "hi-IN"
+
+    result = replay(events, client)
+    assert result["failed"] == 0
+    assert result["mismatched"] == 0
+
+
+def test_voice_rejects_path_in_lang():
+    response = client.post("/voice?lang=../../../../tmp/evil/x", data={"CallSid": "int022"})
+    assert response.status_code == 200
+    assert "Welcome to Indian Railways" in response.text
+
+
+def test_voice_hindi_greeting_and_conversation():
+    cid = "int014"
+    r1 = client.post("/voice?lang=hi-IN", data={"CallSid": cid})
+    assert "भारतीय रेल हेल्पलाइन" in r1.text
+    assert 'language="hi-IN"' in r1.text
+    assert "/voice?lang=hi-IN" in r1.text
+
+    r2 = client.post("/conversation", data={"CallSid": cid, "SpeechResult": "टिकट बुक करना है"})
+    assert "स्लीपर या एसी" in r2.text
+
+    r3 = client.post("/conversation", data={"CallSid": cid, "SpeechResult": "धन्यवाद"})
+    assert "<Hangup" in r3.text
+
+
+def test_status_callbacks_feed_stats():
+    before = client.get("/stats?window=minute").json()["minute"]["statuses"]
+
+    client.post("/call/status", data={"CallSid": "int015", "CallStatus": "ringing"})
+    client.post("/call/status", data={"CallSid": "int015", "CallStatus": "completed", "CallDuration": "42"})
+    client.post("/call/status", data={"CallSid": "int016", "CallStatus": "busy", "SipResponseCode": "486"})
+    client.post("/call/end", data={"CallSid": "int016", "CallStatus": "busy", "SipResponseCode": "486"})
+
+    stats = client.get("/stats").json()
+    assert set(stats) == {"minute", "hour", "day"}
+    minute = stats["minute"]
+    assert minute["statuses"]["completed"] == before.get("completed", 0) + 1
+    assert minute["statuses"]["busy"] == before.get("busy", 0) + 1
+    assert minute["sip_codes"]["486"] >= 1
+
+
+def test_status_callback_without_status():
+    response = client.post("/call/status", data={"CallSid": "int017"})
+    assert "Missing 'CallStatus'" in response.text
+
+
+def test_status_callback_with_non_utf8_body():
+    response = client.post(
+        "/call/status", content=b"CallSid=int024&CallStatus=completed&FromCity=S%E3o+Paulo",
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert response.status_code == 204
+    response = client.post(
+        "/call/status", content=b"CallSid=int024&CallStatus=completed&FromCity=S\xe3o",
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert response.status_code == 204
+
+
+def test_stats_unknown_window():
+    response = client.get("/stats?window=week")
+    assert "Unknown window" in response.text
+
+
+def test_pnr_intent_prefetches_callers_recent_pnrs():
+    from ivr_backend import lookups
+    caller = {"From": "+919999900000", "FromCity": "Chennai"}
+
+    client.post("/conversation", data={"CallSid": "int018", "SpeechResult": "check pnr", **caller})
+    client.post("/conversation", data={"CallSid": "int018", "SpeechResult": "4444444444", **caller})
+    client.post("/call/end", data={"CallSid": "int018"})
+
+    lookups.clear()
+    client.post("/conversation", data={"CallSid": "int019", "SpeechResult": "check my pnr", **caller})
+    assert lookups.stats["fetches"] == 1  # warmed from the previous call
+
+    response = client.post("/conversation", data={"CallSid": "int019", "SpeechResult": "4444444444", **caller})
+    assert "PNR 4444444444 is confirmed" in response.text
+    assert lookups.stats["fetches"] == 1
+
+
+def test_greeting_only_calls_leave_no_session():
+    from ivr_backend import session_context
+    for i in range(5):
+        client.post("/voice", data={"CallSid": f"int027-{i}", "From": "+919800000027", "FromCity": "Pune"})
+    assert not any(cid.startswith("int027-") for cid in session_context)
+
+
+def test_failing_lookup_asks_caller_to_retry(monkeypatch):
+    import ivr_backend
+
+    def broken(pnr):
+        raise ConnectionError("PNR service down")
+
+    monkeypatch.setitem(ivr_backend.LOOKUPS, "check_pnr", broken)
+    ivr_backend.lookups.clear()
+    client.post("/conversation", data={"CallSid": "int025", "SpeechResult": "check pnr"})
+    response = client.post("/conversation", data={"CallSid": "int025", "SpeechResult": "5555555555"})
+    assert response.status_code == 200
+    assert "not available right now" in response.text
+    assert ivr_backend.session_context["int025"]["last_intent"] == "check_pnr"
+    ivr_backend.lookups.clear()
+
+
+def test_slow_lookup_times_out_on_media_stream(monkeypatch):
+    import time
+    import ivr_backend
+
+    def slow(train):
+        time.sleep(0.5)
+        return {"train": train}
+
+    monkeypatch.setitem(ivr_backend.LOOKUPS, "platform_locator", slow)
+    monkeypatch.setattr(ivr_backend, "LOOKUP_TIMEOUT", 0.05)
+    ivr_backend.lookups.clear()
+    with client.websocket_connect("/media-stream") as ws:
+        ws.send_json({"event": "start", "streamSid": "MZ3", "start": {"callSid": "int026"}})
+        ws.send_json({"event": "transcript", "transcript": {"text": "which platform", "final": True}})
+        ws.receive_json()
+        started = time.perf_counter()
+        ws.send_json({"event": "transcript", "transcript": {"text": "12951", "final": True}})
+        assert "not available right now" in ws.receive_json()["twiml"]
+        assert time.perf_counter() - started < 0.4
+        # the stream is still usable after the failed lookup
+        ws.send_json({"event": "transcript", "transcript": {"text": "book a ticket", "final": True}})
+        assert ws.receive_json()["event"] == "response"
+        ws.send_json({"event": "stop"})
+    ivr_backend.lookups.clear()
+
+
+def test_train_followup_without_number_skips_backend():
+    from ivr_backend import lookups
+    client.post("/conversation", data={"CallSid": "int021", "SpeechResult": "which platform"})
+    lookups.clear()
+
+    response = client.post("/conversation", data={"CallSid": "int021", "SpeechResult": "i dont know"})
+    assert "five digit train number" in response.text
+    assert lookups.stats["fetches"] == 0
+
+    response = client.post("/conversation", data={"CallSid": "int021", "SpeechResult": "12951"})
+    assert "platform number 5" in response.text
+    assert lookups.stats["fetches"] == 1
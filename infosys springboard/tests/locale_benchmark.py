@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from statistics import median
+
+# CONFIGURATION
+
+RUNS = 5                 # fresh interpreter per run; medians are reported
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOCALES_DIR = os.path.join(PACKAGE_DIR, "locales")
+
+# 12 languages: the English default plus 11 Indian languages. Bundles that are
+# not shipped yet are generated from the Hindi one, which is enough to measure
+# loading and memory cost.
+LANGUAGES = ["en-IN", "hi-IN", "bn-IN", "ta-IN", "te-IN", "mr-IN", "gu-IN", "kn-IN", "ml-IN", "pa-IN", "or-IN", "ur-IN"]
+
+# Runs in a fresh interpreter: cold start = import + first English turn.
+CHILD = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import ivr_backend
+from fastapi.testclient import TestClient
+imported = time.perf_counter()
+client = TestClient(ivr_backend.app)
+client.post("/voice", data={"CallSid": "bench"})
+client.post("/conversation", data={"CallSid": "bench", "SpeechResult": "check my pnr"})
+first_turn = time.perf_counter()
+for i, code in enumerate(sys.argv[1:]):
+    cid = f"bench-{i}"
+    client.post(f"/voice?lang={code}", data={"CallSid": cid})
+    client.post("/conversation", data={"CallSid": cid, "SpeechResult": "1"})
+print(json.dumps({
+    "import_ms": (imported - t0) * 1000,
+    "first_turn_ms": (first_turn - t0) * 1000,
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "loaded": ivr_backend.locales.loaded(),
+}))
+"""
+
+
+def make_locales_dir(codes):
+    path = tempfile.mkdtemp(prefix="ivr-locales-")
+    with open(os.path.join(LOCALES_DIR, "hi-IN.json"), encoding="utf-8") as f:
+        template = json.load(f)
+    for code in codes:
+        shipped = os.path.join(LOCALES_DIR, f"{code}.json")
+        if os.path.exists(shipped):
+            shutil.copy(shipped, path)
+            continue
+        bundle = dict(template, code=code, language=code)
+        with open(os.path.join(path, f"{code}.json"), "w", encoding="utf-8") as f:
+            json.dump(bundle, f, ensure_ascii=False)
+    return path
+
+
+def run_child(locales_dir, touch_locales=()):
+    env = dict(os.environ, LOCALES_DIR=locales_dir, CALL_JOURNAL_DIR="", PYTHONPATH=PACKAGE_DIR)
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, *touch_locales],
+        env=env, cwd=PACKAGE_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(name, locales_dir, touch_locales=()):
+    runs = [run_child(locales_dir, touch_locales) for _ in range(RUNS)]
+    print(f"{name:<34} import={median(r['import_ms'] for r in runs):7.1f} ms  "
+          f"first turn={median(r['first_turn_ms'] for r in runs):7.1f} ms  "
+          f"max RSS={median(r['rss_kb'] for r in runs) / 1024:6.1f} MB  "
+          f"compiled={len(runs[-1]['loaded'])}")
+
+
+def run_benchmark():
+    english_only = make_locales_dir(["en-IN"])
+    all_languages = make_locales_dir(LANGUAGES)
+    try:
+        print("\n LOCALE STARTUP / MEMORY BENCHMARK")
+        print("============================")
+        measure("English only (1 bundle)", english_only)
+        measure(f"{len(LANGUAGES)} bundles, English calls", all_languages)
+        measure(f"{len(LANGUAGES)} bundles, every language called", all_languages, LANGUAGES[1:])
+        print("============================")
+    finally:
+        shutil.rmtree(english_only)
+        shutil.rmtree(all_languages)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,125 @@
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from statistics import mean, median
+
+# Keep the benchmark's turns and rollups out of the real stores
+os.environ["CALL_JOURNAL_DIR"] = ""
+os.environ["CALL_STATS_DB"] = ""
+
+from fastapi.testclient import TestClient
+import ivr_backend
+
+# CONFIGURATION
+
+CALLS = 10               # measured calls per mode
+BACKEND_DELAY = 0.3      # simulated PNR / train service latency (seconds)
+THINK_TIME = 0.5         # caller hears the prompt and says the number
+STATION = "Pune"
+HOT_TRAIN = "12951"
+CONCURRENT_CALLERS = 10  # callers asking for the same train at once
+
+client = TestClient(ivr_backend.app)
+
+
+def slow(fn):
+    def wrapped(key):
+        time.sleep(BACKEND_DELAY)
+        return fn(key)
+    return wrapped
+
+
+def caller(i):
+    return {"From": f"+9190000{i:05d}", "FromCity": STATION}
+
+
+def pnr_of(i):
+    return f"{4000000000 + i}"
+
+
+def seed_history():
+    """
+    Earlier calls: every caller once checked their PNR, and the hot train was
+    asked about at the station.
+    """
+    for i in range(CALLS):
+        cid = str(uuid.uuid4())
+        client.post("/conversation", data={"CallSid": cid, "SpeechResult": "check pnr", **caller(i)})
+        client.post("/conversation", data={"CallSid": cid, "SpeechResult": pnr_of(i), **caller(i)})
+        client.post("/call/end", data={"CallSid": cid})
+        cid = str(uuid.uuid4())
+        client.post("/conversation", data={"CallSid": cid, "SpeechResult": "live status of train", **caller(i)})
+        client.post("/conversation", data={"CallSid": cid, "SpeechResult": HOT_TRAIN, **caller(i)})
+        client.post("/call/end", data={"CallSid": cid})
+
+
+def follow_up_latency(i, question, answer):
+    cid = str(uuid.uuid4())
+    client.post("/conversation", data={"CallSid": cid, "SpeechResult": question, **caller(i)})
+    time.sleep(THINK_TIME)
+    t0 = time.perf_counter()
+    client.post("/conversation", data={"CallSid": cid, "SpeechResult": answer, **caller(i)})
+    elapsed = time.perf_counter() - t0
+    client.post("/call/end", data={"CallSid": cid})
+    return elapsed
+
+
+def run_mode(speculative):
+    ivr_backend.SPECULATIVE_PREFETCH = speculative
+    latencies = []
+    for i in range(CALLS):
+        # cold cache per call: only speculation, not TTL reuse, is measured
+        ivr_backend.lookups.clear()
+        latencies.append(follow_up_latency(i, "check my pnr", pnr_of(i)))
+        ivr_backend.lookups.clear()
+        latencies.append(follow_up_latency(i, "where is my train running", HOT_TRAIN))
+    return latencies
+
+
+def run_coalescing():
+    """
+    Many callers answer with the same train at the same moment on a cold cache.
+    """
+    ivr_backend.SPECULATIVE_PREFETCH = False
+    ivr_backend.lookups.clear()
+    cids = [str(uuid.uuid4()) for _ in range(CONCURRENT_CALLERS)]
+    for i, cid in enumerate(cids):
+        client.post("/conversation", data={"CallSid": cid, "SpeechResult": "which platform", **caller(i)})
+
+    def answer(cid):
+        t0 = time.perf_counter()
+        client.post("/conversation", data={"CallSid": cid, "SpeechResult": HOT_TRAIN})
+        return time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=CONCURRENT_CALLERS) as pool:
+        latencies = list(pool.map(answer, cids))
+    return latencies, ivr_backend.lookups.stats["fetches"]
+
+
+def report(name, latencies):
+    ms = sorted(x * 1000 for x in latencies)
+    print(f"{name:<24} turns={len(ms):<4} mean={mean(ms):8.1f} ms  p50={median(ms):8.1f} ms  max={ms[-1]:8.1f} ms")
+
+
+def run_benchmark():
+    for intent in list(ivr_backend.LOOKUPS):
+        ivr_backend.LOOKUPS[intent] = slow(ivr_backend.LOOKUPS[intent])
+
+    seed_history()
+    baseline = run_mode(speculative=False)
+    speculative = run_mode(speculative=True)
+    coalesced, fetches = run_coalescing()
+
+    print("\n FOLLOW-UP TURN LATENCY (simulated slow lookups)")
+    print("============================")
+    print(f"Calls: {CALLS}  Backend delay: {BACKEND_DELAY}s  Think time: {THINK_TIME}s")
+    report("no prefetch", baseline)
+    report("speculative prefetch", speculative)
+    report(f"{CONCURRENT_CALLERS} concurrent, same key", coalesced)
+    print(f"Back-end fetches for the {CONCURRENT_CALLERS} concurrent answers: {fetches}")
+    print("============================")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import random
+import time
+from urllib.parse import urlencode
+
+# Keep the benchmark's rollups and turns out of the real stores
+os.environ["CALL_STATS_DB"] = ""
+os.environ["CALL_JOURNAL_DIR"] = ""
+
+import ivr_backend
+from call_stats import CallStats
+
+# CONFIGURATION
+
+NUM_EVENTS = 50000       # status callbacks per run
+TARGET_RATE = 10000      # events/sec one worker must sustain
+
+# Lifecycle mix of a typical call: initiated → ringing → in-progress → outcome
+OUTCOMES = [("completed", 0.7), ("no-answer", 0.15), ("busy", 0.1), ("failed", 0.05)]
+SIP_CODES = {"completed": "200", "no-answer": "480", "busy": "486", "failed": "503"}
+
+
+def make_events(n):
+    rng = random.Random(7)
+    events = []
+    while len(events) < n:
+        sid = f"CA{len(events):032d}"
+        outcome = rng.choices([o for o, _ in OUTCOMES], [w for _, w in OUTCOMES])[0]
+        events.append({"CallSid": sid, "CallStatus": "initiated"})
+        events.append({"CallSid": sid, "CallStatus": "ringing"})
+        if outcome == "completed":
+            events.append({"CallSid": sid, "CallStatus": "in-progress"})
+        final = {"CallSid": sid, "CallStatus": outcome, "SipResponseCode": SIP_CODES[outcome]}
+        if outcome == "completed":
+            final["CallDuration"] = str(int(rng.lognormvariate(4.5, 0.8)))
+        events.append(final)
+    return events[:n]
+
+
+def bench_aggregator(events):
+    """
+    Aggregation alone: what the endpoint adds on top of HTTP handling.
+    """
+    stats = CallStats()
+    t0 = time.perf_counter()
+    for form in events:
+        duration = form.get("CallDuration")
+        stats.record(form["CallStatus"], float(duration) if duration else None, form.get("SipResponseCode"))
+    return len(events) / (time.perf_counter() - t0)
+
+
+async def call_app(app, method, path, body=b""):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 5000), "server": ("ivr", 80),
+        "headers": [(b"content-type", b"application/x-www-form-urlencoded"), (b"content-length", str(len(body)).encode())],
+    }
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def bench_endpoint(events):
+    """
+    Full /call/status handling through the ASGI app in one event loop, i.e.
+    the time a single uvicorn worker spends in the app per callback
+    (HTTP parsing by the server is not included).
+    """
+    app = ivr_backend.app
+    bodies = [urlencode(form).encode() for form in events]
+    t0 = time.perf_counter()
+    for body in bodies:
+        assert await call_app(app, "POST", "/call/status", body) == 204
+    elapsed = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(100):
+        await call_app(app, "GET", "/stats")
+    stats_ms = (time.perf_counter() - t0) * 10
+    return len(events) / elapsed, stats_ms
+
+
+def run_benchmark():
+    events = make_events(NUM_EVENTS)
+    aggregator_rate = bench_aggregator(events)
+    endpoint_rate, stats_ms = asyncio.run(bench_endpoint(events))
+
+    print("\n STATUS CALLBACK INGESTION BENCHMARK")
+    print("============================")
+    print(f"Events:                 {NUM_EVENTS}")
+    print(f"Aggregator only:        {aggregator_rate:10.0f} events/sec")
+    print(f"/call/status (ASGI):    {endpoint_rate:10.0f} events/sec  (target {TARGET_RATE})")
+    print(f"/stats query:           {stats_ms:10.2f} ms")
+    print("============================")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,134 @@
+import json
+import os
+import sys
+import time
+import uuid
+from statistics import mean, median
+
+# Keep the benchmark's turns and rollups out of the real stores
+os.environ["CALL_JOURNAL_DIR"] = ""
+os.environ["CALL_STATS_DB"] = ""
+
+from fastapi.testclient import TestClient
+import ivr_backend
+
+# CONFIGURATION
+
+ROUNDS = 3               # how many times every recorded stream is replayed
+PACED = True             # False = send partials back to back (lookups started from partials get no head start)
+LOOKUP_DELAY = 0.2       # simulated back-end lookup time (seconds)
+
+# Recorded transcript streams: (offset in seconds, transcript, final).
+# Each stream is one call; a call can hold several turns.
+# Pass a JSON file with the same shape as the first argument to replay your own.
+RECORDED_STREAMS = [
+    [
+        (0.0, "i want", False),
+        (0.4, "i want to check", False),
+        (0.8, "i want to check my pnr", False),
+        (1.5, "i want to check my pnr", True),
+        (3.0, "1234", False),
+        (3.6, "1234567", False),
+        (4.2, "1234567890", False),
+        (4.9, "1234567890", True),
+    ],
+    [
+        (0.0, "where", False),
+        (0.3, "where is my train", False),
+        (0.7, "where is my train running", False),
+        (1.4, "where is my train running", True),
+        (2.8, "12951", False),
+        (3.5, "12951", True),
+    ],
+    [
+        (0.0, "book", False),
+        (0.3, "book a ticket", False),
+        (1.0, "book a ticket", True),
+    ],
+]
+
+
+def slow(fn):
+    def wrapped(key):
+        time.sleep(LOOKUP_DELAY)
+        return fn(key)
+    return wrapped
+
+
+def replay_stream(ws, stream, paced):
+    """
+    Local stand-in for the speech-recognition relay: sends one recorded stream over
+    /media-stream and returns the end-of-speech → response latency of each turn.
+    """
+    call_id = str(uuid.uuid4())  # Fake CallSid
+    ws.send_json({"event": "connected"})
+    ws.send_json({"event": "start", "streamSid": f"MZ{call_id}", "start": {"callSid": call_id}})
+
+    latencies = []
+    started = time.perf_counter()
+    for offset, text, final in stream:
+        if paced:
+            time.sleep(max(0.0, offset - (time.perf_counter() - started)))
+        ws.send_json({"event": "transcript", "transcript": {"text": text, "final": final}})
+        if final:
+            t0 = time.perf_counter()
+            ws.receive_json()
+            latencies.append(time.perf_counter() - t0)
+
+    ws.send_json({"event": "stop"})
+    ivr_backend.session_context.pop(call_id, None)
+    return latencies
+
+
+def replay_final_only(client, stream):
+    """
+    Same turns posted to /conversation with only the final SpeechResult,
+    as a <Gather> without partial results would.
+    """
+    call_id = str(uuid.uuid4())
+    latencies = []
+    for _, text, final in stream:
+        if final:
+            t0 = time.perf_counter()
+            client.post("/conversation", data={"CallSid": call_id, "SpeechResult": text})
+            latencies.append(time.perf_counter() - t0)
+    client.post("/call/end", data={"CallSid": call_id})
+    return latencies
+
+
+def report(name, latencies):
+    ms = sorted(x * 1000 for x in latencies)
+    print(f"{name:<24} turns={len(ms):<5} mean={mean(ms):8.2f} ms  "
+          f"p50={median(ms):8.2f} ms  p95={ms[int(len(ms) * 0.95) - 1]:8.2f} ms")
+
+
+def run_benchmark(streams):
+    for intent in list(ivr_backend.LOOKUPS):
+        ivr_backend.LOOKUPS[intent] = slow(ivr_backend.LOOKUPS[intent])
+
+    client = TestClient(ivr_backend.app)
+    streamed, final_only = [], []
+
+    for _ in range(ROUNDS):
+        for stream in streams:
+            # each replay starts with a cold lookup cache
+            ivr_backend.lookups.clear()
+            with client.websocket_connect("/media-stream") as ws:
+                streamed.extend(replay_stream(ws, stream, PACED))
+            ivr_backend.lookups.clear()
+            final_only.extend(replay_final_only(client, stream))
+
+    print("\n END-OF-SPEECH → RESPONSE LATENCY")
+    print("============================")
+    print(f"Streams: {len(streams)}  Rounds: {ROUNDS}  Paced: {PACED}  Lookup delay: {LOOKUP_DELAY}s")
+    report("final result only", final_only)
+    report("streamed partials", streamed)
+    print("============================")
+
+
+if __name__ == "__main__":
+    streams = RECORDED_STREAMS
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            streams = [[tuple(event) for event in stream] for stream in json.load(f)]
+    run_benchmark(streams)
@@ -1,6 +1,12 @@
+import os
+import threading
 import pytest
 from fastapi import Response
-from ivr_backend import detect_intent, next_step, session_context
+from call_journal import CallJournal, read_events, journal_files
+from call_stats import CallStats, StatsStore
+from lookup_cache import LookupCache
+from locale_bundles import LocaleCache
+from ivr_backend import detect_intent, next_step, session_context, process_partial, call_locale, lookups, lookup_key, fetch_pnr_status, warm_lookups, remember_lookup, recent_pnrs, hot_trains
 
 
 # =========================================================
@@ -111,7 +117,7 @@ async def test_valid_pnr_followup():
     call_id = "u5"
     session_context[call_id] = {"last_intent": "check_pnr"}
 
-    resp = next_step(call_id, "1234567890")
+    resp = next_step(call_id, "1234567890", fetch_pnr_status("1234567890"))
     body = resp.body.decode()
 
     assert "confirmed" in body.lower()
@@ -181,3 +187,306 @@ async def test_next_step_unknown_with_context():
 
     resp = next_step(call_id, "??")
     assert "Please specify your class" in resp.body.decode()
+
+
+# =========================================================
+# UNIT TESTS FOR PARTIAL-RESULT EARLY INTENT DETECTION
+# =========================================================
+
+def test_partial_detects_intent_before_final():
+    call_id = "u12"
+    session_context.pop(call_id, None)
+
+    assert process_partial(call_id, "i want to") == "unknown"
+    assert process_partial(call_id, "i want to cancel") == "cancel_ticket"
+    # Partials never change the conversation state; only the final turn does
+    assert call_id not in session_context
+
+
+def test_partial_prefetches_pnr_lookup():
+    call_id = "u13"
+    session_context[call_id] = {"last_intent": "check_pnr"}
+    lookups.clear()
+
+    process_partial(call_id, "12345")
+    assert lookups.stats["fetches"] == 0
+
+    process_partial(call_id, "1234567890")
+    process_partial(call_id, "1234567890")
+    assert lookups.stats["fetches"] == 1
+
+    resp = next_step(call_id, "1234567890", lookups.get("check_pnr", "1234567890"))
+    assert "PNR 1234567890 is confirmed" in resp.body.decode()
+    assert lookups.stats["fetches"] == 1
+
+
+# =========================================================
+# UNIT TESTS FOR THE CALL-EVENT JOURNAL
+# =========================================================
+
+def test_journal_batches_and_reads_back(tmp_path):
+    journal = CallJournal(str(tmp_path), flush_interval=60)
+    journal.record("j1", "/conversation", "book ticket", "book_ticket", "intent:book_ticket", "abcd", 1.5)
+    journal.record("j1", "/conversation", "AC", "unknown", "followup:book_ticket", "ef01", 0.7)
+    journal.close()
+
+    events = list(read_events(str(tmp_path)))
+    assert [e["input"] for e in events] == ["book ticket", "AC"]
+    assert events[1]["branch"] == "followup:book_ticket"
+    assert events[0]["latency_ms"] == 1.5
+
+
+def test_journal_rotates_by_size(tmp_path):
+    journal = CallJournal(str(tmp_path), max_bytes=200, backup_count=2, batch_size=1, flush_interval=60)
+    for i in range(10):
+        journal.record(f"j{i}", "/conversation", "x" * 40, "unknown", "followup:none", "", 0.1)
+        journal.flush()
+    journal.close()
+
+    files = journal_files(str(tmp_path))
+    assert [os.path.basename(f) for f in files] == ["calls.jsonl.2", "calls.jsonl.1", "calls.jsonl"]
+    assert all(os.path.getsize(f) <= 200 for f in files)
+    # oldest rotated-out events are gone, newest are last
+    assert list(read_events(str(tmp_path)))[-1]["call_sid"] == "j9"
+
+
+def test_journal_files_ignore_other_files(tmp_path):
+    for name in ("calls.jsonl", "calls.jsonl.1", "other.log.3", "calls.jsonl.bak", "x.jsonl"):
+        (tmp_path / name).write_text("")
+    files = journal_files(str(tmp_path))
+    assert [os.path.basename(f) for f in files] == ["calls.jsonl.1", "calls.jsonl"]
+
+
+def test_journal_ring_buffer_drops_oldest(tmp_path):
+    journal = CallJournal(str(tmp_path), buffer_size=3, autostart=False)
+    for i in range(5):
+        journal.record(f"j{i}", "/voice", "", None, "greeting", "", 0.1)
+    assert journal.dropped == 2
+    journal.flush()
+    assert [e["call_sid"] for e in read_events(str(tmp_path / "calls.jsonl"))] == ["j2", "j3", "j4"]
+
+
+# =========================================================
+# UNIT TESTS FOR LOCALE BUNDLES
+# =========================================================
+
+def test_detect_intent_hindi():
+    assert detect_intent("मुझे टिकट बुक करना है", "hi-IN") == "book_ticket"
+    assert detect_intent("मेरा टिकट रद्द करो", "hi-IN") == "cancel_ticket"
+    assert detect_intent("पीएनआर स्थिति", "hi-IN") == "check_pnr"
+    assert detect_intent("मुझे सहायता चाहिए", "hi-IN") == "special_assistance"
+
+
+def test_hindi_no_ends_call_only_as_whole_answer():
+    call_id = "u16"
+    session_context[call_id] = {"last_intent": None, "locale": "hi-IN"}
+    assert "<Hangup" not in next_step(call_id, "मुझे समझ नहीं आया").body.decode()
+
+    session_context[call_id] = {"last_intent": None, "locale": "hi-IN"}
+    assert "<Hangup" in next_step(call_id, "जी नहीं।").body.decode()
+
+
+def test_detect_intent_hindi_where_is():
+    assert detect_intent("प्लेटफॉर्म कहाँ है", "hi-IN") == "platform_locator"
+    assert detect_intent("मेरी ट्रेन कहाँ है", "hi-IN") == "train_live_status"
+    assert detect_intent("मेरी ट्रेन कहां है", "hi-IN") == "train_live_status"
+
+
+def test_next_step_hindi_followup():
+    call_id = "u14"
+    session_context[call_id] = {"last_intent": "check_pnr", "locale": "hi-IN"}
+
+    body = next_step(call_id, "1234567890", fetch_pnr_status("1234567890")).body.decode()
+    assert "पी एन आर 1234567890 कन्फर्म है" in body
+    assert 'language="hi-IN"' in body and 'voice="Polly.Aditi"' in body
+
+
+def test_unknown_locale_falls_back_to_default():
+    assert call_locale("xx-XX")["code"] == "en-IN"
+
+
+def test_locale_code_never_leaves_locales_dir(tmp_path, monkeypatch):
+    import locale_bundles
+    call_locale()  # default bundle is loaded before LOCALES_DIR moves
+    (tmp_path / "evil.json").write_text("{}")
+    monkeypatch.setattr(locale_bundles, "LOCALES_DIR", str(tmp_path / "locales"))
+    with pytest.raises(KeyError):
+        locale_bundles.load_bundle("../evil")
+    assert call_locale("../evil")["code"] == "en-IN"
+
+
+def test_broken_locale_bundle_falls_back_to_default(tmp_path, monkeypatch):
+    import locale_bundles
+    call_locale()  # default bundle is loaded before LOCALES_DIR moves
+    (tmp_path / "xx-YY.json").write_text("{not json")
+    monkeypatch.setattr(locale_bundles, "LOCALES_DIR", str(tmp_path))
+    assert call_locale("xx-YY")["code"] == "en-IN"
+
+
+def test_locale_cache_evicts_least_recently_used():
+    built = []
+    cache = LocaleCache(lambda code: built.append(code) or code, max_size=2)
+    for code in ("hi-IN", "ta-IN", "hi-IN", "bn-IN"):
+        cache.get(code)
+    cache.get()
+
+    assert cache.loaded() == ["en-IN", "hi-IN", "bn-IN"]
+    cache.get("ta-IN")
+    assert built == ["hi-IN", "ta-IN", "bn-IN", "en-IN", "ta-IN"]
+
+
+# =========================================================
+# UNIT TESTS FOR CALL-LIFECYCLE STATS
+# =========================================================
+
+def test_call_stats_rolling_windows():
+    stats = CallStats()
+    now = 1_700_000_000
+    stats.record("completed", 120, now=now - 7200)  # two hours ago: day window only
+    stats.record("busy", sip_code="486", now=now - 600)
+    stats.record("completed", 60, now=now - 5)
+    stats.record("no-answer", now=now - 1)
+
+    minute = stats.window("minute", now).summary()
+    assert minute["statuses"] == {"completed": 1, "no-answer": 1}
+    assert minute["answer_rate"] == 0.5
+
+    hour = stats.window("hour", now).summary()
+    assert hour["events"] == 3
+    assert hour["sip_codes"] == {"486": 1}
+
+    day = stats.window("day", now).summary()
+    assert day["statuses"]["completed"] == 2
+    assert day["duration"]["count"] == 2
+
+
+def test_call_stats_old_buckets_are_reused():
+    stats = CallStats()
+    now = 1_700_000_000
+    stats.record("completed", 30, now=now - 60)
+    stats.record("completed", 30, now=now)  # same one-second slot, one minute later
+    assert stats.window("minute", now).summary()["events"] == 1
+
+
+def test_duration_percentiles_are_approximate():
+    stats = CallStats()
+    now = 1_700_000_000
+    for seconds in range(1, 101):
+        stats.record("completed", seconds, now=now)
+    duration = stats.window("hour", now).summary()["duration"]
+    assert abs(duration["p50"] - 50) <= 50 * 0.06
+    assert abs(duration["p90"] - 90) <= 90 * 0.06
+    assert duration["avg"] == 50.5
+
+
+def test_call_stats_flushes_closed_minutes(tmp_path):
+    store = StatsStore(str(tmp_path / "stats.db"))
+    stats = CallStats(store, autostart=False)
+    now = 1_700_000_070
+    stats.record("completed", 45, now=now - 120)
+    stats.record("failed", sip_code="503", now=now - 61)
+    stats.record("ringing", now=now)
+
+    stats.flush(now)
+    rows = store.read()
+    assert [r.start for r in rows] == [now // 60 * 60 - 120, now // 60 * 60 - 60]
+    assert rows[0].statuses == {"completed": 1} and rows[0].duration_count == 1
+    assert rows[1].sip_codes == {"503": 1}
+
+    # already stored minutes are not written again
+    stats.flush(now)
+    assert len(store.read()) == 2
+
+
+def test_call_stats_survive_restart_in_same_minute(tmp_path):
+    store = StatsStore(str(tmp_path / "stats.db"))
+    now = 1_700_000_070
+    before = CallStats(store, now=now, autostart=False)
+    before.record("completed", 90, now=now - 7200)
+    before.record("busy", sip_code="486", now=now - 5)
+    before.record("completed", 30, now=now)
+    before.flush(now, include_open=True)  # shutdown flush
+
+    after = CallStats(store, now=now + 10, autostart=False)
+    assert after.window("hour", now + 10).summary()["events"] == 2
+    assert after.window("day", now + 10).summary()["statuses"] == {"completed": 2, "busy": 1}
+
+    # the open minute keeps its pre-restart counts once written again
+    after.record("no-answer", now=now + 10)
+    after.flush(now + 60)
+    rows = {r.start: r for r in store.read()}
+    assert rows[now // 60 * 60].statuses == {"busy": 1, "completed": 1, "no-answer": 1}
+    assert len(rows) == 2
+
+
+# =========================================================
+# UNIT TESTS FOR SPECULATIVE LOOKUP PREFETCH
+# =========================================================
+
+def test_lookup_key_normalizes_followups():
+    assert lookup_key("check_pnr", " 1234567890 ") == "1234567890"
+    assert lookup_key("check_pnr", "12345") is None
+    assert lookup_key("train_live_status", "train 12951 please") == "12951"
+    assert lookup_key("book_ticket", "12951") is None
+
+
+def test_train_followup_without_number_asks_again():
+    call_id = "u15"
+    session_context[call_id] = {"last_intent": "train_live_status"}
+
+    body = next_step(call_id, "i dont know").body.decode()
+    assert "five digit train number" in body
+    assert session_context[call_id]["last_intent"] == "train_live_status"
+
+
+def test_lookup_cache_coalesces_in_flight_lookups():
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(key):
+        calls.append(key)
+        release.wait(5)
+        return {"key": key}
+
+    cache = LookupCache({"check_pnr": slow_fetch}, ttl=60)
+    first = cache.submit("check_pnr", "1")
+    second = cache.submit("check_pnr", "1")
+    assert first is second
+    release.set()
+    first.result(5)
+    assert cache.get("check_pnr", "1") == {"key": "1"}
+    assert calls == ["1"]
+    assert cache.stats == {"hits": 1, "coalesced": 1, "fetches": 1}
+
+
+def test_hot_trains_tracks_a_bounded_number_of_stations(monkeypatch):
+    import ivr_backend
+    monkeypatch.setattr(ivr_backend, "MAX_TRACKED_STATIONS", 3)
+    hot_trains.clear()
+    for i in range(5):
+        remember_lookup({"station": f"Station {i}"}, "platform_locator", "12951")
+    remember_lookup({}, "platform_locator", "12951")
+
+    assert len(hot_trains) == 3
+    assert list(hot_trains) == ["Station 3", "Station 4", ""]
+    assert hot_trains[""]["12951"] == 6
+    hot_trains.clear()
+
+
+def test_warm_lookups_uses_caller_history_and_hot_trains():
+    lookups.clear()
+    recent_pnrs.clear()
+    hot_trains.clear()
+    context = {"caller": "+911111111111", "station": "Pune"}
+    remember_lookup(context, "check_pnr", "1111111111")
+    remember_lookup(context, "check_pnr", "2222222222")
+    for _ in range(3):
+        remember_lookup(context, "train_live_status", "12951")
+    remember_lookup({"station": "Delhi"}, "train_live_status", "12002")
+
+    assert list(recent_pnrs["+911111111111"]) == ["2222222222", "1111111111"]
+    assert hot_trains["Pune"].most_common(1) == [("12951", 3)]
+
+    warm_lookups(context, "check_pnr")
+    warm_lookups(context, "train_live_status")
+    assert lookups.stats["fetches"] == 3